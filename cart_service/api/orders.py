@@ -1,7 +1,7 @@
 from fastapi import APIRouter, HTTPException, Depends, status
 from fastapi.responses import JSONResponse
-from pydantic import BaseModel, Field, field_validator
-from typing import Optional, List
+from pydantic import BaseModel, Field, TypeAdapter, field_validator
+from typing import Optional, List, Dict, Any
 from decimal import Decimal
 from datetime import datetime
 import logging
@@ -9,9 +9,12 @@ import random
 import string
 import uuid
 import re
+import numpy as np
+
+from api.responses import ORJSONResponse
 
 # Import RabbitMQ service
-from services.rabbitmq import get_rabbitmq_service, RabbitMQService
+from services.rabbitmq import get_rabbitmq_service, RabbitMQService, BrokerUnavailableError
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -51,25 +54,53 @@ class OrderResponse(BaseModel):
     class Config:
         from_attributes = True
 
+# Built once; serializes an order to JSON-safe primitives in pydantic-core
+_ORDER_ADAPTER = TypeAdapter(OrderResponse)
+
+# ID alphabet plus a byte translation table for generate_random_string.
+# Random bytes map to alphabet[b % 36]; the top 256 % 36 byte values are
+# dropped first so every character stays equally likely.
+_ID_CHARS = (string.ascii_uppercase + string.digits).encode("ascii")
+_ID_TABLE = bytes(_ID_CHARS[b % len(_ID_CHARS)] for b in range(256))
+_ID_REJECT = bytes(range(256 - 256 % len(_ID_CHARS), 256))
+
+# Vectorized generator for item data; draws whole batches in C
+_RNG = np.random.default_rng()
+_ID_ALPHABET = np.frombuffer(_ID_CHARS, dtype=np.uint8)
+_ITEM_ID_LENGTH = 6
+
 # Helper functions
 def generate_random_string(length: int = 8) -> str:
     """Generate random string for IDs"""
-    return ''.join(random.choices(string.ascii_uppercase + string.digits, k=length))
-
-def generate_random_items(count: int) -> List[OrderItem]:
-    """Generate random order items"""
-    items = []
-    for _ in range(count):
-        item = OrderItem(
-            itemId=generate_random_string(6),
-            quantity=random.randint(1, 10),
-            price=Decimal(str(round(random.uniform(5.0, 100.0), 2)))
-        )
-        items.append(item)
-    return items
+    buf = random.randbytes(length).translate(_ID_TABLE, _ID_REJECT)
+    while len(buf) < length:
+        buf += random.randbytes(length - len(buf)).translate(_ID_TABLE, _ID_REJECT)
+    return buf.decode("ascii")
+
+def generate_random_items(count: int) -> List[Dict[str, Any]]:
+    """Generate random order items as plain dicts (no per-item validation)"""
+    quantities = _RNG.integers(1, 11, size=count).tolist()
+    prices = np.round(_RNG.uniform(5.0, 100.0, size=count), 2).tolist()
+    id_chars = _ID_ALPHABET[_RNG.integers(0, len(_ID_ALPHABET), size=count * _ITEM_ID_LENGTH)]
+    id_blob = id_chars.tobytes().decode("ascii")
+    item_ids = [id_blob[i:i + _ITEM_ID_LENGTH] for i in range(0, len(id_blob), _ITEM_ID_LENGTH)]
+
+    return [
+        {"itemId": item_id, "quantity": quantity, "price": Decimal(str(price))}
+        for item_id, quantity, price in zip(item_ids, quantities, prices)
+    ]
 
 # API Endpoints
-@router.post("/create-order", response_model=OrderResponse, status_code=status.HTTP_201_CREATED)
+# The response is rendered straight from the already-dumped dict, so FastAPI's
+# response-model validation and jsonable_encoder pass are skipped; the model
+# is still advertised in the OpenAPI schema
+@router.post(
+    "/create-order",
+    response_model=None,
+    response_class=ORJSONResponse,
+    status_code=status.HTTP_201_CREATED,
+    responses={201: {"model": OrderResponse}}
+)
 async def create_order(
     order_request: CreateOrderRequest,
     rabbitmq: RabbitMQService = Depends(get_rabbitmq_service)
@@ -85,29 +116,39 @@ async def create_order(
     items = generate_random_items(order_request.numberOfItems)
     
     # Calculate total amount
-    total_amount = sum(item.price * item.quantity for item in items)
+    total_amount = sum(item["price"] * item["quantity"] for item in items)
     
     # Random currency and status
     currencies = ["USD", "ILS"]
     
-    order_response = OrderResponse(
+    # We generated every field ourselves, so skip validation on construction
+    order_response = OrderResponse.model_construct(
         orderId=order_request.orderId,
         customerId=customer_id,
         orderDate=order_date,
-        items=items,
+        items=[OrderItem.model_construct(**item) for item in items],
         totalAmount=total_amount,
         currency=random.choice(currencies),
         status="new"
     )
     
+    # One pass in pydantic-core to JSON-safe primitives (Decimals as
+    # strings); both the event and the HTTP response are encoded from it in C.
+    # A dict rather than dump_json bytes, since the publisher wraps it in the
+    # event envelope and may encode it as MessagePack (EVENT_ENCODING)
+    order_dict = _ORDER_ADAPTER.dump_python(order_response, mode="json")
+
     # Publish order event to RabbitMQ
     try:
-        # Convert Pydantic model to dict for JSON serialization
-        order_dict = order_response.model_dump()
         await rabbitmq.publish_order_event(order_dict, "order_created")
-        logger.info(f"Order event published to RabbitMQ for order: {order_request.orderId}")
+    except BrokerUnavailableError as unavailable_error:
+        logger.error(f"Failed to publish to RabbitMQ: {str(unavailable_error)}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Message broker unavailable, please retry later"
+        )
     except Exception as rabbitmq_error:
         logger.error(f"Failed to publish to RabbitMQ: {str(rabbitmq_error)}")
     
-    logger.info(f"Order created successfully: {order_request.orderId}")
-    return order_response
+    logger.debug("Order created successfully: %s", order_request.orderId)
+    return ORJSONResponse(order_dict, status_code=status.HTTP_201_CREATED)
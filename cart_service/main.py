@@ -1,20 +1,31 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
 from fastapi import status, Request
+import atexit
 import logging
+import logging.handlers
+import os
+import queue
 import uvicorn
-import asyncio
 from contextlib import asynccontextmanager
 
 # Import your API routers
 from api.orders import router as orders_router
+from api.responses import ORJSONResponse
 from services.rabbitmq import rabbitmq_service
 
-# Configure logging
+# Configure logging: handlers only enqueue records, and a listener thread
+# does the actual stream writes off the event loop
+log_queue = queue.SimpleQueue()
+log_listener = logging.handlers.QueueListener(log_queue, logging.StreamHandler())
+log_listener.start()
+# Stop (and flush) at interpreter exit rather than in the lifespan, so
+# records logged after shutdown still reach the stream
+atexit.register(log_listener.stop)
 logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    level=os.getenv("LOG_LEVEL", "WARNING").upper(),
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    handlers=[logging.handlers.QueueHandler(log_queue)]
 )
 logger = logging.getLogger(__name__)
 
@@ -24,23 +35,15 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting up the application...")
 
-    max_attempts = 12  # e.g. wait up to ~60 seconds total
-    delay_seconds = 5
-
-    for attempt in range(1, max_attempts + 1):
-        try:
-            # Initialize RabbitMQ connection
-            logger.info(f"Attempting to connect to RabbitMQ (attempt {attempt}/{max_attempts})...")
-            await rabbitmq_service.connect()
-            logger.info("RabbitMQ connection established")
-            break
-        except Exception as e:
-            logger.error(f"Failed to connect to RabbitMQ during startup (attempt {attempt}): {e}")
-            if attempt == max_attempts:
-                logger.error("Max attempts reached. Proceeding without RabbitMQ connection.")
-            else:
-                logger.info(f"Waiting {delay_seconds} seconds before next RabbitMQ connection attempt...")
-                await asyncio.sleep(delay_seconds)
+    try:
+        # Initialize RabbitMQ connection
+        await rabbitmq_service.connect()
+        logger.info("RabbitMQ connection established")
+    except Exception as e:
+        # Don't block startup on the broker; keep retrying with backoff in
+        # the background while /create-order answers 503
+        logger.error(f"Failed to connect to RabbitMQ during startup: {e}")
+        rabbitmq_service.start_reconnect()
     
     yield
     
@@ -58,7 +61,8 @@ app = FastAPI(
     title="Orders API",
     description="API for managing orders with RabbitMQ event publishing",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -76,7 +80,7 @@ app.include_router(orders_router, tags=["orders"])
 # Exception handlers
 @app.exception_handler(ValueError)
 async def value_error_handler(request: Request, exc: ValueError):
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_400_BAD_REQUEST,
         content={"message": str(exc)}
     )
@@ -101,11 +105,17 @@ async def root():
     }
 
 if __name__ == "__main__":
-    # Run the application
+    # Run the application. All endpoints are `async def`, so nothing on the
+    # hot path goes through the threadpool; scale out with worker processes
+    # instead (2n+1). In the container, gunicorn + UvicornWorker does this.
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=8000,
-        reload=True,
-        log_level="info"
+        loop="uvloop",
+        http="httptools",
+        workers=max(2, (os.cpu_count() or 1) * 2 + 1),
+        backlog=4096,
+        timeout_keep_alive=75,
+        log_level="warning"
     )
@@ -1,52 +1,239 @@
-import json
 import asyncio
 import os
-from typing import Dict, Any
+import random
+import weakref
+from typing import Dict, Any, List, Optional, Set, Tuple
 import aio_pika
+import msgpack
+import orjson
 from aio_pika import ExchangeType
+from aio_pika.exceptions import AMQPConnectionError, ChannelInvalidStateError
+from aio_pika.pool import Pool
 import logging
 
 logger = logging.getLogger(__name__)
 
+CONTENT_TYPE_JSON = "application/json"
+CONTENT_TYPE_MSGPACK = "application/msgpack"
+_DUMP_OPTS = orjson.OPT_NON_STR_KEYS
+
+def _encode_default(obj: Any) -> str:
+    """Fallback encoder for types orjson/msgpack don't handle natively (e.g. Decimal)"""
+    return str(obj)
+
+def _encode_event(payload: Dict[str, Any], content_type: str) -> bytes:
+    """Serialize an event payload for the given content type"""
+    if content_type == CONTENT_TYPE_MSGPACK:
+        return msgpack.packb(payload, default=_encode_default, use_bin_type=True)
+    return orjson.dumps(payload, default=_encode_default, option=_DUMP_OPTS)
+
+class BrokerUnavailableError(Exception):
+    """Raised when publishing while there is no open RabbitMQ connection"""
+
 class RabbitMQService:
     """RabbitMQ service for publishing order events"""
+
+    # Exponential backoff (with jitter) between background reconnect attempts
+    RECONNECT_BASE_DELAY = 0.5
+    RECONNECT_MAX_DELAY = 30.0
     
     def __init__(self, rabbitmq_url: str = None):
         self.rabbitmq_url = rabbitmq_url or os.getenv("RABBITMQ_URL", "amqp://localhost:5672")
         logger.info(f"Initializing RabbitMQ service with URL: {self.rabbitmq_url}")
-        self.connection = None
-        self.channel = None
-        self.exchange = None
         self.exchange_name = "orders_exchange"
+        # Event bodies are JSON (the events are broadcast and the spec calls
+        # for JSON); EVENT_ENCODING=msgpack opts into the smaller MessagePack
+        # body for consumers that read it, keyed on content type
+        if os.getenv("EVENT_ENCODING", "json").lower() == "msgpack":
+            self.content_type = CONTENT_TYPE_MSGPACK
+        else:
+            self.content_type = CONTENT_TYPE_JSON
+        # Publishes run over a pool of channels spread round-robin across a
+        # few connections, so concurrent requests don't queue behind one channel
+        self.connection_pool_size = int(os.getenv("RABBITMQ_CONN_POOL", "2"))
+        self.channel_pool_size = int(os.getenv("RABBITMQ_CHAN_POOL", "32"))
+        self._connections: List[aio_pika.abc.AbstractRobustConnection] = []
+        self._next_connection = 0
+        self._chan_pool: Optional[Pool] = None
+        # Exchange object per pooled channel, dropped with the channel
+        self._exchange_cache: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        # Publishes are queued and flushed in batches by a background task;
+        # each batch is pipelined on one confirm-mode channel
+        self.publish_batch_size = int(os.getenv("PUBLISH_BATCH", "64"))
+        self._publish_q: Optional[asyncio.Queue] = None
+        self._publisher_task: Optional[asyncio.Task] = None
+        self._batch_tasks: Set[asyncio.Task] = set()
+        self._reconnect_task: Optional[asyncio.Task] = None
+
+    @property
+    def is_started(self) -> bool:
+        """Whether connect() has set up the pools and the publisher"""
+        return (
+            self._publish_q is not None
+            and self._chan_pool is not None
+            and not self._chan_pool.is_closed
+        )
+
+    @property
+    def is_connected(self) -> bool:
+        """Whether the publisher is running and a broker connection is live
+
+        The robust connections clear ``connected`` while they are down and
+        reconnecting, so this turns False as soon as the broker drops.
+        """
+        return self.is_started and any(
+            connection.connected.is_set() for connection in self._connections
+        )
+
+    async def _get_channel(self) -> aio_pika.abc.AbstractChannel:
+        """Pool constructor for channels, opened round-robin over the connections"""
+        connection = self._connections[self._next_connection % len(self._connections)]
+        self._next_connection += 1
+        return await connection.channel()
         
+    async def _get_exchange(self, channel: aio_pika.abc.AbstractChannel) -> aio_pika.abc.AbstractExchange:
+        """Return the orders exchange bound to a channel, cached per channel"""
+        exchange = self._exchange_cache.get(channel)
+        if exchange is None:
+            exchange = await channel.get_exchange(self.exchange_name, ensure=False)
+            self._exchange_cache[channel] = exchange
+        return exchange
+
     async def connect(self):
         """Establish connection to RabbitMQ"""
+        if self.is_started:
+            # Already set up; the robust connections recover on their own
+            return
         try:
-            self.connection = await aio_pika.connect_robust(self.rabbitmq_url)
-            self.channel = await self.connection.channel()
-            
-            # Declare exchange for topic-based routing
-            self.exchange = await self.channel.declare_exchange(
-                self.exchange_name,
-                ExchangeType.TOPIC,  # Topic exchange for pattern-based routing
-                durable=True
-            )
+            # Connections and the channel pool are created here rather than in
+            # __init__ so they bind to the running event loop (the service is
+            # instantiated at import)
+            for _ in range(max(1, self.connection_pool_size)):
+                self._connections.append(await aio_pika.connect_robust(self.rabbitmq_url))
+            self._chan_pool = Pool(self._get_channel, max_size=self.channel_pool_size)
+
+            async with self._chan_pool.acquire() as channel:
+                # Declare exchange for topic-based routing
+                await channel.declare_exchange(
+                    self.exchange_name,
+                    ExchangeType.TOPIC,  # Topic exchange for pattern-based routing
+                    durable=True
+                )
             
+            self._publish_q = asyncio.Queue()
+            self._publisher_task = asyncio.create_task(self._publisher_loop())
+
             logger.info("Connected to RabbitMQ successfully")
             
         except Exception as e:
             logger.error(f"Failed to connect to RabbitMQ: {str(e)}")
+            await self._close()
             raise
     
+    def start_reconnect(self):
+        """Keep retrying connect() in the background until it succeeds"""
+        if self._reconnect_task and not self._reconnect_task.done():
+            return
+        self._reconnect_task = asyncio.create_task(self._reconnect_loop())
+
+    async def _reconnect_loop(self):
+        """Retry connect() with exponential backoff and jitter"""
+        attempt = 0
+        while not self.is_started:
+            backoff = min(self.RECONNECT_MAX_DELAY, self.RECONNECT_BASE_DELAY * 2 ** min(attempt, 16))
+            delay = backoff * (0.5 + random.random())
+            attempt += 1
+            logger.info(f"Reconnecting to RabbitMQ in {delay:.1f}s (attempt {attempt})...")
+            await asyncio.sleep(delay)
+            try:
+                await self.connect()
+            except Exception:
+                pass  # connect() already logged the failure
+
     async def disconnect(self):
         """Close RabbitMQ connection"""
+        if self._reconnect_task:
+            self._reconnect_task.cancel()
+            try:
+                await self._reconnect_task
+            except asyncio.CancelledError:
+                pass
+            finally:
+                self._reconnect_task = None
+
+        await self._close()
+
+    async def _close(self):
+        """Stop the publisher and close the channel pool and connections"""
         try:
-            if self.connection and not self.connection.is_closed:
-                await self.connection.close()
+            await self._stop_publisher()
+
+            # Channels first, then the connections they live on
+            if self._chan_pool and not self._chan_pool.is_closed:
+                await self._chan_pool.close()
+            connections, self._connections = self._connections, []
+            for connection in connections:
+                if not connection.is_closed:
+                    await connection.close()
+            if connections:
                 logger.info("Disconnected from RabbitMQ")
         except Exception as e:
             logger.error(f"Error disconnecting from RabbitMQ: {str(e)}")
     
+    async def _stop_publisher(self):
+        """Stop the background publisher and fail any publishes still queued"""
+        if self._publisher_task:
+            self._publisher_task.cancel()
+            try:
+                await self._publisher_task
+            except asyncio.CancelledError:
+                pass
+            finally:
+                self._publisher_task = None
+
+        if self._batch_tasks:
+            await asyncio.gather(*self._batch_tasks, return_exceptions=True)
+
+        if self._publish_q:
+            while not self._publish_q.empty():
+                _, _, future = self._publish_q.get_nowait()
+                if not future.done():
+                    future.set_exception(ConnectionError("RabbitMQ publisher stopped"))
+            self._publish_q = None
+
+    async def _publisher_loop(self):
+        """Drain the publish queue into batches and hand each to a channel"""
+        while True:
+            batch = [await self._publish_q.get()]
+            while len(batch) < self.publish_batch_size and not self._publish_q.empty():
+                batch.append(self._publish_q.get_nowait())
+
+            # Batches run concurrently, bounded by the channel pool size
+            task = asyncio.create_task(self._publish_batch(batch))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def _publish_batch(self, batch: List[Tuple[aio_pika.Message, str, asyncio.Future]]):
+        """Publish a batch on one channel and await all confirms together"""
+        try:
+            async with self._chan_pool.acquire() as channel:
+                exchange = await self._get_exchange(channel)
+                results = await asyncio.gather(
+                    *(exchange.publish(message, routing_key=routing_key) for message, routing_key, _ in batch),
+                    return_exceptions=True
+                )
+        except Exception as e:
+            results = [e] * len(batch)
+
+        # Resolve each caller individually so failures stay per-order
+        for (_, _, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(None)
+
     async def publish_order_event(self, order_data: Dict[str, Any], event_type: str = "order_created"):
         """
         Publish order event to RabbitMQ exchange
@@ -55,11 +242,15 @@ class RabbitMQService:
             order_data: Order data dictionary (already serializable)
             event_type: Type of event (default: order_created)
         """
+        # Fail fast instead of connecting inside the request; the reconnect
+        # task (or the robust connections themselves, once started) bring the
+        # connection back for later requests
+        if not self.is_connected:
+            if not self.is_started:
+                self.start_reconnect()
+            raise BrokerUnavailableError("RabbitMQ broker unavailable")
+
         try:
-            # Ensure connection is established
-            if not self.connection or self.connection.is_closed:
-                await self.connect()
-            
             # Create event payload
             event_payload = {
                 "event_type": event_type,
@@ -67,26 +258,37 @@ class RabbitMQService:
                 "data": order_data
             }
             
-            # Serialize to JSON
-            message_body = json.dumps(event_payload, default=str)
+            # Serialize body; the headers stay plain strings so the consumer
+            # can filter without decoding it
+            message_body = _encode_event(event_payload, self.content_type)
             
             # Create message
+            # The order ID doubles as the idempotency key; the order service
+            # keeps the first copy of an order and acks any duplicates
             message = aio_pika.Message(
-                message_body.encode('utf-8'),
-                content_type='application/json',
+                message_body,
+                content_type=self.content_type,
+                message_id=order_data.get('orderId'),
                 headers={
                     'event_type': event_type,
                     'order_id': order_data.get('orderId'),
-                    'customer_id': order_data.get('customerId')
+                    'customer_id': order_data.get('customerId'),
+                    'idempotency_key': order_data.get('orderId')
                 }
             )
             
             # Publish to exchange with routing key: new.{orderId}
             order_id = order_data.get("orderId")
             routing_key = f"new.{order_id}"
-            await self.exchange.publish(message, routing_key=routing_key)
+            future = asyncio.get_running_loop().create_future()
+            self._publish_q.put_nowait((message, routing_key, future))
+            try:
+                await future
+            except (ConnectionError, AMQPConnectionError, ChannelInvalidStateError) as e:
+                # The broker dropped between the check above and the publish
+                raise BrokerUnavailableError(f"RabbitMQ broker unavailable: {e}") from e
             
-            logger.info(f"Published {event_type} event for order {order_data.get('orderId')}")
+            logger.debug("Published %s event for order %s", event_type, order_id)
             
         except Exception as e:
             logger.error(f"Failed to publish order event: {str(e)}")
@@ -94,9 +296,9 @@ class RabbitMQService:
             raise
 
     async def ensure_connection(self):
-        """Ensure RabbitMQ connection is active"""
-        if not self.connection or self.connection.is_closed:
-            await self.connect()
+        """Ensure RabbitMQ connection is active (or being re-established)"""
+        if not self.is_started:
+            self.start_reconnect()
 
 # Global RabbitMQ service instance
 rabbitmq_service = RabbitMQService()
@@ -4,6 +4,7 @@ from typing import List
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from pydantic import BaseModel, Field
 
+from api.responses import ORJSONResponse
 from services.order_service import OrderService, OrderNotFoundError
 from container import order_service as order_service_instance
 
@@ -28,21 +29,33 @@ class OrderDetailsResponse(BaseModel):
     shippingCost: Decimal = Field(..., description="Calculated shipping charge")
 
 
+# Stored records carry extra keys (e.g. metadata); only these are returned
+_RESPONSE_FIELDS = tuple(OrderDetailsResponse.model_fields)
+
+
 async def get_order_service() -> OrderService:
     return order_service_instance
 
 
-@router.get("/order-details", response_model=OrderDetailsResponse)
+@router.get(
+    "/order-details",
+    response_model=None,
+    response_class=ORJSONResponse,
+    responses={200: {"model": OrderDetailsResponse}},
+)
 async def order_details(
     order_id: str = Query(..., alias="orderId", description="Identifier of the order to retrieve"),
     order_service: OrderService = Depends(get_order_service),
 ):
     """
     Retrieve stored order details including the computed shipping cost.
+
+    The stored record was already normalized on ingest, so it is encoded
+    directly instead of being re-validated against the response model.
     """
     try:
         order = await order_service.get_order(order_id)
-        return order
+        return ORJSONResponse({field: order[field] for field in _RESPONSE_FIELDS})
     except OrderNotFoundError:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -1,4 +1,8 @@
+import atexit
 import logging
+import logging.handlers
+import os
+import queue
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
@@ -6,11 +10,21 @@ from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
 from api.orders import router as orders_router
+from api.responses import ORJSONResponse
 from container import order_consumer
 
+# Handlers only enqueue records; a listener thread does the stream writes
+# so the event loop never blocks on stderr
+log_queue = queue.SimpleQueue()
+log_listener = logging.handlers.QueueListener(log_queue, logging.StreamHandler())
+log_listener.start()
+# Stop (and flush) at interpreter exit rather than in the lifespan, so
+# records logged after shutdown still reach the stream
+atexit.register(log_listener.stop)
 logging.basicConfig(
-    level=logging.INFO,
+    level=os.getenv("LOG_LEVEL", "WARNING").upper(),
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    handlers=[logging.handlers.QueueHandler(log_queue)],
 )
 logger = logging.getLogger(__name__)
 
@@ -39,6 +53,7 @@ app = FastAPI(
     description="Consumes order events and exposes enriched order details",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 app.add_middleware(
@@ -63,5 +78,16 @@ async def root():
 
 
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8100, reload=True)
+    # Orders live in process memory and each worker would run its own
+    # consumer, so this service stays on a single (uvloop) worker.
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8100,
+        loop="uvloop",
+        http="httptools",
+        backlog=4096,
+        timeout_keep_alive=75,
+        log_level="warning",
+    )
 
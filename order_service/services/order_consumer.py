@@ -1,37 +1,61 @@
 import asyncio
-import json
 import logging
 import os
-from typing import Optional
+import random
+from typing import List, Optional
 
 import aio_pika
+import msgpack
+import orjson
 from aio_pika import IncomingMessage
 
 from services.order_service import OrderService
 
 logger = logging.getLogger(__name__)
 
+CONTENT_TYPE_MSGPACK = "application/msgpack"
+
 
 class OrderConsumer:
     """Consumes RabbitMQ events and delegates them to the order service."""
 
+    # Exponential backoff (with jitter) between connection attempts
+    RECONNECT_BASE_DELAY = 0.5
+    RECONNECT_MAX_DELAY = 30.0
+
     def __init__(self, order_service: OrderService, rabbitmq_url: Optional[str] = None) -> None:
         self._order_service = order_service
         self._rabbitmq_url = rabbitmq_url or os.getenv("RABBITMQ_URL", "amqp://localhost:5672")
         self._connection: Optional[aio_pika.RobustConnection] = None
         self._channel: Optional[aio_pika.Channel] = None
+        self._exchange: Optional[aio_pika.Exchange] = None
         self._queue: Optional[aio_pika.Queue] = None
         self._consume_task: Optional[asyncio.Task] = None
         self._exchange_name = "orders_exchange"
         self._queue_name = os.getenv("ORDER_QUEUE_NAME", "order_service_new_orders")
+        # Let the broker keep several deliveries in flight; they are handled
+        # in batches (concurrently within a batch, bounded by the semaphore)
+        # and each fully successful batch is acked with a single frame
+        self._prefetch_count = int(os.getenv("PREFETCH", "64"))
+        self._ack_batch_size = int(os.getenv("ACK_BATCH", "64"))
+        self._handler_concurrency = int(os.getenv("HANDLER_CONC", "32"))
+        # Created in start() so they bind to the running event loop (the
+        # consumer is instantiated at import)
+        self._handler_sem: Optional[asyncio.Semaphore] = None
+        self._deliveries: Optional[asyncio.Queue] = None
 
     async def start(self) -> None:
-        """Initialize RabbitMQ structures and begin consuming messages."""
+        """Begin connecting and consuming in the background.
+
+        Startup doesn't wait for the broker; the connection is retried with
+        backoff until it succeeds, then consumption starts.
+        """
         if self._consume_task and not self._consume_task.done():
             return
 
-        await self._connect()
-        self._consume_task = asyncio.create_task(self._consume_loop())
+        self._handler_sem = asyncio.Semaphore(self._handler_concurrency)
+        self._deliveries = asyncio.Queue()
+        self._consume_task = asyncio.create_task(self._run())
         logger.info("Order consumer started")
 
     async def stop(self) -> None:
@@ -49,51 +73,146 @@ class OrderConsumer:
             await self._connection.close()
             logger.info("Order consumer connection closed")
 
+    async def _run(self) -> None:
+        """Connect (with retries) and then consume until cancelled."""
+        await self._connect_with_backoff()
+        await self._consume_loop()
+
+    async def _connect_with_backoff(self) -> None:
+        """Retry _connect with exponential backoff and jitter until it succeeds."""
+        attempt = 0
+        while True:
+            try:
+                await self._connect()
+                logger.info("Order consumer connected to RabbitMQ")
+                return
+            except Exception as exc:
+                # Drop a half-initialized connection (e.g. exchange not declared yet)
+                if self._connection and not self._connection.is_closed:
+                    await self._connection.close()
+
+                backoff = min(self.RECONNECT_MAX_DELAY, self.RECONNECT_BASE_DELAY * 2 ** min(attempt, 16))
+                delay = backoff * (0.5 + random.random())
+                attempt += 1
+                logger.warning(
+                    "Failed to connect order consumer (attempt %s): %s; retrying in %.1fs",
+                    attempt,
+                    exc,
+                    delay,
+                )
+                await asyncio.sleep(delay)
+
     async def _connect(self) -> None:
         """Ensure we have an active connection, channel, queue and binding."""
         self._connection = await aio_pika.connect_robust(self._rabbitmq_url)
         self._channel = await self._connection.channel()
+        await self._channel.set_qos(prefetch_count=self._prefetch_count)
 
         # Get reference to existing exchange (declared on producer side)
-        exchange = await self._channel.get_exchange(self._exchange_name)
+        self._exchange = await self._channel.get_exchange(self._exchange_name)
 
         self._queue = await self._channel.declare_queue(
             self._queue_name,
             durable=True,
         )
         # Bind queue with topic pattern "new.*"
-        await self._queue.bind(exchange, routing_key="new.*")
+        await self._queue.bind(self._exchange, routing_key="new.*")
 
     async def _consume_loop(self) -> None:
-        """Continuously read messages from the queue."""
+        """Continuously read messages from the queue in batches."""
         assert self._queue is not None
 
         try:
-            async with self._queue.iterator() as queue_iter:
-                async for message in queue_iter:
-                    await self._handle_message(message)
+            await self._queue.consume(self._on_delivery)
+            while True:
+                batch = [await self._deliveries.get()]
+                while len(batch) < self._ack_batch_size and not self._deliveries.empty():
+                    batch.append(self._deliveries.get_nowait())
+
+                # A failed ack/nack (e.g. the channel dropped mid-batch) must
+                # not end the loop; unacked messages are redelivered
+                try:
+                    # Deliveries buffered before a reconnect belong to the old,
+                    # closed channel; their tags can't be acked and the broker
+                    # redelivers them on the new channel anyway. The channel
+                    # recorded at delivery is checked because
+                    # IncomingMessage.channel raises once it is closed.
+                    messages = [message for message, channel in batch if not channel.is_closed]
+                    if messages:
+                        await self._process_batch(messages)
+                except Exception as exc:
+                    logger.exception("Failed to settle batch of %s messages: %s", len(batch), exc)
         except asyncio.CancelledError:
             logger.info("Order consumer cancelled")
         except Exception as exc:
             logger.exception("Order consumer crashed: %s", exc)
 
+    async def _on_delivery(self, message: IncomingMessage) -> None:
+        """Buffer a delivery, with the channel it arrived on, for the consume loop."""
+        self._deliveries.put_nowait((message, message.channel))
+
+    async def _process_batch(self, batch: List[IncomingMessage]) -> None:
+        """Handle a batch concurrently, then ack it.
+
+        Batches are processed one at a time and deliveries arrive in order,
+        so when every message succeeded a single ack(multiple=True) on the
+        last one covers exactly this batch. Otherwise successes are acked
+        and failures nacked one by one; a failed message is requeued once
+        and dropped if it fails again on redelivery, so a poison message
+        can't loop forever.
+        """
+        results = await asyncio.gather(
+            *(self._guarded_handle(message) for message in batch),
+            return_exceptions=True,
+        )
+
+        # BaseException, so a cancelled handler is not taken as a success
+        if not any(isinstance(result, BaseException) for result in results):
+            await batch[-1].ack(multiple=True)
+            return
+
+        for message, result in zip(batch, results):
+            if isinstance(result, BaseException):
+                logger.error("Failed to handle message: %s", result, exc_info=result)
+                await message.nack(requeue=not message.redelivered)
+            else:
+                await message.ack()
+
+    async def _guarded_handle(self, message: IncomingMessage) -> None:
+        """Handle one message within the concurrency limit."""
+        async with self._handler_sem:
+            await self._handle_message(message)
+
     async def _handle_message(self, message: IncomingMessage) -> None:
-        """Parse and process a single message."""
-        async with message.process(ignore_processed=True):
-            try:
-                payload = json.loads(message.body.decode("utf-8"))
-            except json.JSONDecodeError:
-                logger.error("Received invalid JSON payload")
-                return
+        """Parse and process a single message.
+
+        Returning normally means the message should be acked (including
+        discarded ones); raising means it failed.
+        """
+        # Other event types are acked without decoding the body
+        event_type = (message.headers or {}).get("event_type")
+        if event_type is not None and event_type != "order_created":
+            logger.info("Discarding message with event type %s", event_type)
+            return
 
-            order_status = payload.get("data", {}).get("status")
-            if order_status != "new":
-                logger.info(
-                    "Discarding order %s with status %s",
-                    payload.get("data", {}).get("orderId"),
-                    order_status,
-                )
-                return
+        try:
+            if message.content_type == CONTENT_TYPE_MSGPACK:
+                payload = msgpack.unpackb(message.body, raw=False)
+            else:
+                # JSON is the producer's default encoding
+                payload = orjson.loads(message.body)
+        except ValueError:
+            logger.error("Received invalid %s payload", message.content_type)
+            return
+
+        order_status = payload.get("data", {}).get("status")
+        if order_status != "new":
+            logger.info(
+                "Discarding order %s with status %s",
+                payload.get("data", {}).get("orderId"),
+                order_status,
+            )
+            return
 
-            await self._order_service.handle_order_event(payload)
+        await self._order_service.handle_order_event(payload)
 
@@ -1,11 +1,21 @@
 import logging
 from decimal import Decimal, InvalidOperation
+from functools import lru_cache
 from typing import Dict, Any, List
 
 from data.order_repository import OrderRepository
 
 logger = logging.getLogger(__name__)
 
+_Q2 = Decimal("0.01")
+_ZERO = Decimal("0")
+
+
+@lru_cache(maxsize=256)
+def _dec_int(value: int) -> Decimal:
+    """Cached Decimal for small integers such as item quantities."""
+    return Decimal(value)
+
 
 class OrderNotFoundError(Exception):
     """Raised when an order cannot be located in the repository."""
@@ -37,7 +47,7 @@ class OrderService:
 
         normalized_items = self._normalize_items(order_data.get("items", []))
         total_amount = self._decimalize(order_data.get("totalAmount"))
-        shipping_cost = (total_amount * self.SHIPPING_RATE).quantize(Decimal("0.01"))
+        shipping_cost = (total_amount * self.SHIPPING_RATE).quantize(_Q2)
 
         record = {
             "orderId": order_data.get("orderId"),
@@ -79,7 +89,7 @@ class OrderService:
                     "itemId": item.get("itemId"),
                     "quantity": quantity,
                     "price": price,
-                    "lineTotal": (price * Decimal(quantity)).quantize(Decimal("0.01")),
+                    "lineTotal": (price * _dec_int(quantity)).quantize(_Q2),
                 }
             )
         return normalized
@@ -87,12 +97,16 @@ class OrderService:
     def _decimalize(self, raw_value: Any) -> Decimal:
         """Convert arbitrary input into a Decimal."""
         if raw_value is None:
-            return Decimal("0")
+            return _ZERO
         if isinstance(raw_value, Decimal):
             return raw_value
+        if isinstance(raw_value, int) and not isinstance(raw_value, bool):
+            return _dec_int(raw_value)
+        if isinstance(raw_value, float):
+            return Decimal(repr(raw_value))
         try:
             return Decimal(str(raw_value))
         except (InvalidOperation, ValueError, TypeError):
             logger.warning("Failed to convert value %s to Decimal; defaulting to 0", raw_value)
-            return Decimal("0")
+            return _ZERO
 
@@ -0,0 +1,154 @@
+import asyncio
+import unittest
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+import orjson
+from aio_pika import IncomingMessage
+from aiormq.abc import DeliveredMessage
+from aiormq.exceptions import ChannelInvalidStateError
+from pamqp.commands import Basic
+from pamqp.header import ContentHeader
+
+from services.order_consumer import OrderConsumer
+
+
+class FakeChannel:
+    """Stands in for the aiormq channel an IncomingMessage settles on."""
+
+    def __init__(self) -> None:
+        self.is_closed = False
+        self.fail_acks = False
+        self.connection = SimpleNamespace(basic_nack=True)
+        self.acks: List[tuple] = []
+        self.nacks: List[tuple] = []
+
+    async def basic_ack(self, delivery_tag: int, multiple: bool = False) -> None:
+        if self.fail_acks:
+            raise ChannelInvalidStateError("channel closed")
+        self.acks.append((delivery_tag, multiple))
+
+    async def basic_nack(self, delivery_tag: int, multiple: bool = False, requeue: bool = True) -> None:
+        self.nacks.append((delivery_tag, requeue))
+
+
+class FakeQueue:
+    """Captures the consume callback so tests can push deliveries."""
+
+    def __init__(self) -> None:
+        self.callback = None
+
+    async def consume(self, callback) -> None:
+        self.callback = callback
+
+
+class FakeOrderService:
+    """Records handled orders and fails the ones it is told to."""
+
+    def __init__(self, failing: Optional[set] = None) -> None:
+        self.failing = failing or set()
+        self.handled: List[str] = []
+
+    async def handle_order_event(self, payload: Dict[str, Any]) -> None:
+        order_id = payload["data"]["orderId"]
+        if order_id in self.failing:
+            raise ValueError(f"cannot process {order_id}")
+        self.handled.append(order_id)
+
+
+def make_message(channel: FakeChannel, delivery_tag: int, order_id: str, redelivered: bool = False) -> IncomingMessage:
+    """Build a real IncomingMessage carrying an order_created event."""
+    body = orjson.dumps({"event_type": "order_created", "data": {"orderId": order_id, "status": "new"}})
+    properties = Basic.Properties(content_type="application/json", headers={"event_type": "order_created"})
+    delivered = DeliveredMessage(
+        delivery=Basic.Deliver(delivery_tag=delivery_tag, redelivered=redelivered, routing_key=f"new.{order_id}"),
+        header=ContentHeader(body_size=len(body), properties=properties),
+        body=body,
+        channel=channel,
+    )
+    return IncomingMessage(delivered)
+
+
+async def wait_for(condition, timeout: float = 1.0) -> None:
+    """Yield to the consume loop until condition() holds."""
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("condition not met in time")
+        await asyncio.sleep(0.01)
+
+
+class OrderConsumerBatchTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.order_service = FakeOrderService(failing={"BAD"})
+        self.consumer = OrderConsumer(self.order_service)
+        self.queue = FakeQueue()
+
+        async def connect() -> None:
+            self.consumer._queue = self.queue
+
+        self.consumer._connect = connect
+        await self.consumer.start()
+        await wait_for(lambda: self.queue.callback is not None)
+
+    async def asyncTearDown(self) -> None:
+        await self.consumer.stop()
+
+    async def deliver(self, *messages: IncomingMessage) -> None:
+        for message in messages:
+            await self.queue.callback(message)
+
+    async def test_successful_batch_is_acked_with_one_multiple_ack(self) -> None:
+        channel = FakeChannel()
+        await self.deliver(*(make_message(channel, tag, f"ORD{tag}") for tag in (1, 2, 3)))
+
+        await wait_for(lambda: channel.acks)
+        self.assertEqual(channel.acks, [(3, True)])
+        self.assertEqual(self.order_service.handled, ["ORD1", "ORD2", "ORD3"])
+
+    async def test_failed_message_is_requeued_once_then_dropped(self) -> None:
+        channel = FakeChannel()
+        with self.assertLogs("services.order_consumer", level="ERROR"):
+            await self.deliver(make_message(channel, 1, "ORD1"), make_message(channel, 2, "BAD"))
+            await wait_for(lambda: channel.nacks)
+        self.assertEqual(channel.acks, [(1, False)])
+        self.assertEqual(channel.nacks, [(2, True)])
+
+        with self.assertLogs("services.order_consumer", level="ERROR"):
+            await self.deliver(make_message(channel, 3, "BAD", redelivered=True))
+            await wait_for(lambda: len(channel.nacks) == 2)
+        self.assertEqual(channel.nacks[1], (3, False))
+
+    async def test_stale_delivery_after_reconnect_is_skipped(self) -> None:
+        old_channel = FakeChannel()
+        stale = make_message(old_channel, 1, "STALE")
+        old_channel.is_closed = True
+        self.consumer._deliveries.put_nowait((stale, old_channel))
+
+        new_channel = FakeChannel()
+        await self.deliver(make_message(new_channel, 1, "ORD1"))
+
+        await wait_for(lambda: new_channel.acks)
+        self.assertEqual(new_channel.acks, [(1, True)])
+        self.assertEqual(old_channel.acks, [])
+        self.assertEqual(self.order_service.handled, ["ORD1"])
+        self.assertFalse(self.consumer._consume_task.done())
+
+    async def test_failed_ack_does_not_stop_the_loop(self) -> None:
+        channel = FakeChannel()
+        channel.fail_acks = True
+        with self.assertLogs("services.order_consumer", level="ERROR") as logs:
+            await self.deliver(make_message(channel, 1, "ORD1"))
+            await wait_for(lambda: self.order_service.handled)
+            await asyncio.sleep(0.05)
+        self.assertIn("Failed to settle batch", logs.output[0])
+        self.assertFalse(self.consumer._consume_task.done())
+
+        new_channel = FakeChannel()
+        await self.deliver(make_message(new_channel, 1, "ORD2"))
+        await wait_for(lambda: new_channel.acks)
+        self.assertEqual(new_channel.acks, [(1, True)])
+
+
+if __name__ == "__main__":
+    unittest.main()